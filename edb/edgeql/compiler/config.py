@@ -22,6 +22,7 @@
 
 from __future__ import annotations
 
+import functools
 import json
 from typing import *  # NoQA
 
@@ -35,6 +36,7 @@ from edb.ir import typeutils as irtyputils
 
 from edb.schema import links as s_links
 from edb.schema import objtypes as s_objtypes
+from edb.schema import schema as s_schema
 from edb.schema import types as s_types
 
 from edb.edgeql import ast as qlast
@@ -90,15 +92,16 @@ def compile_ConfigReset(
     info = _validate_op(expr, ctx=ctx)
     filter_expr = expr.where
     select_ir = None
+    is_object_param = info.param_type.is_object_type()
 
-    if not info.param_type.is_object_type() and filter_expr is not None:
+    if not is_object_param and filter_expr is not None:
         raise errors.QueryError(
             'RESET of a primitive configuration parameter '
             'must not have a FILTER clause',
             context=expr.context,
         )
 
-    elif info.param_type.is_object_type():
+    elif is_object_param:
         param_type_name = info.param_type.get_name(ctx.env.schema)
         param_type_ref = qlast.ObjectRef(
             name=param_type_name.name,
@@ -222,11 +225,11 @@ def _validate_config_object(
         ctx: context.ContextLevel) -> None:
 
     for element in expr.shape:
-        if element.rptr.ptrref.shortname.name == 'id':
-            continue
-
-        if (irtyputils.is_object(element.typeref)
-                and isinstance(element.expr, irast.InsertStmt)):
+        # Only nested INSERTs need validation, so test for those first
+        # and avoid walking the pointer reference of every element.
+        if (isinstance(element.expr, irast.InsertStmt)
+                and irtyputils.is_object(element.typeref)
+                and element.rptr.ptrref.shortname.name != 'id'):
             _validate_config_object(element, level=level, ctx=ctx)
 
 
@@ -240,16 +243,17 @@ def _validate_op(
             '\'cfg\' or empty', context=expr.name.context,
         )
 
+    schema = ctx.env.schema
     name = expr.name.name
-    cfg_host_type = ctx.env.get_track_schema_type('cfg::Config')
-    assert isinstance(cfg_host_type, s_objtypes.ObjectType)
+    cfg_host_type = _get_cfg_host_type(schema)
+    ctx.env.schema_refs.add(cfg_host_type)
     cfg_type = None
 
     if isinstance(expr, (qlast.ConfigSet, qlast.ConfigReset)):
         # expr.name is the actual name of the property.
-        ptr = cfg_host_type.getptr(ctx.env.schema, name)
+        ptr = cfg_host_type.getptr(schema, name)
         if ptr is not None:
-            cfg_type = ptr.get_target(ctx.env.schema)
+            cfg_type = ptr.get_target(schema)
 
     if cfg_type is None:
         if isinstance(expr, qlast.ConfigSet):
@@ -266,48 +270,37 @@ def _validate_op(
                 context=expr.context
             )
 
-        ptr = None
-
-        mro = [cfg_type] + list(
-            cfg_type.get_ancestors(ctx.env.schema).objects(ctx.env.schema))
-        for ct in mro:
-            ptrs = ctx.env.schema.get_referrers(
-                ct, scls_type=s_links.Link, field_name='target')
+        ptr = _get_cfg_type_referrer(schema, cfg_type)
 
-            if ptrs:
-                ptr = next(iter(ptrs))
-                break
-
-        if ptr is None or ptr.get_source(ctx.env.schema) != cfg_host_type:
+        if ptr is None or ptr.get_source(schema) != cfg_host_type:
             raise errors.ConfigurationError(
                 f'{name!r} cannot be configured directly'
             )
 
-        name = ptr.get_shortname(ctx.env.schema).name
+        name = ptr.get_shortname(schema).name
+
+    annotations = ptr.get_annotations(schema)
 
-    sys_attr = ptr.get_annotations(ctx.env.schema).get(
-        ctx.env.schema, 'cfg::system', None)
+    sys_attr = annotations.get(schema, 'cfg::system', None)
 
     system = (
         sys_attr is not None
-        and sys_attr.get_value(ctx.env.schema) == 'true'
+        and sys_attr.get_value(schema) == 'true'
     )
 
-    cardinality = ptr.get_cardinality(ctx.env.schema)
+    cardinality = ptr.get_cardinality(schema)
 
-    restart_attr = ptr.get_annotations(ctx.env.schema).get(
-        ctx.env.schema, 'cfg::requires_restart', None)
+    restart_attr = annotations.get(schema, 'cfg::requires_restart', None)
 
     requires_restart = (
         restart_attr is not None
-        and restart_attr.get_value(ctx.env.schema) == 'true'
+        and restart_attr.get_value(schema) == 'true'
     )
 
-    backend_attr = ptr.get_annotations(ctx.env.schema).get(
-        ctx.env.schema, 'cfg::backend_setting', None)
+    backend_attr = annotations.get(schema, 'cfg::backend_setting', None)
 
     if backend_attr is not None:
-        backend_setting = json.loads(backend_attr.get_value(ctx.env.schema))
+        backend_setting = json.loads(backend_attr.get_value(schema))
     else:
         backend_setting = None
 
@@ -323,6 +316,33 @@ def _validate_op(
                        backend_setting=backend_setting)
 
 
+@functools.lru_cache()
+def _get_cfg_host_type(schema: s_schema.Schema) -> s_objtypes.ObjectType:
+    cfg_host_type = schema.get('cfg::Config', type=s_objtypes.ObjectType)
+    assert isinstance(cfg_host_type, s_objtypes.ObjectType)
+    return cfg_host_type
+
+
+@functools.lru_cache()
+def _get_cfg_type_referrer(
+        schema: s_schema.Schema,
+        cfg_type: s_types.Type) -> Optional[s_links.Link]:
+    # Find the link pointing to the configuration object type
+    # (or any of its ancestors).
+    mro = [cfg_type] + list(cfg_type.get_ancestors(schema).objects(schema))
+    for ct in mro:
+        ptr = next(
+            iter(schema.get_referrers(
+                ct, scls_type=s_links.Link, field_name='target')),
+            None,
+        )
+
+        if ptr is not None:
+            return ptr
+
+    return None
+
+
 def get_config_type_shape(
         schema, stype, path) -> List[qlast.ShapeElement]:
     shape = []
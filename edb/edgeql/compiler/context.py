@@ -150,6 +150,15 @@ class Environment:
     allow_generic_type_output: bool
     """Whether to allow the expression to be of a generic type."""
 
+    type_ref_cache: Dict[Tuple[s_schema.Schema, s_types.Type], irast.TypeRef]
+    """A cache of IR type references for schema types."""
+
+    path_id_cache: Dict[
+        Tuple[s_schema.Schema, s_obj.Object, Optional[str], FrozenSet[str]],
+        irast.PathId,
+    ]
+    """A cache of path ids for schema types."""
+
     def __init__(self, *, schema, path_scope,
                  parent_object_type: Optional[s_obj.ObjectMeta]=None,
                  schema_view_mode: bool=False,
@@ -179,6 +188,8 @@ class Environment:
         self.schema_refs = set()
         self.func_params = func_params
         self.parent_object_type = parent_object_type
+        self.type_ref_cache = {}
+        self.path_id_cache = {}
 
     def get_track_schema_object(
         self,
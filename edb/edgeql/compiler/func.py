@@ -22,19 +22,23 @@
 
 from __future__ import annotations
 
+import copy
+import functools
 import typing
+import uuid
 
 from edb import errors
 
 from edb.ir import ast as irast
-from edb.ir import typeutils as irtyputils
 from edb.ir import utils as irutils
 
 from edb.schema import constraints as s_constr
+from edb.schema import expr as s_expr
 from edb.schema import functions as s_func
 from edb.schema import modules as s_mod
 from edb.schema import name as sn
 from edb.schema import operators as s_oper
+from edb.schema import schema as s_schema
 from edb.schema import types as s_types
 from edb.schema import utils as s_utils
 
@@ -53,15 +57,119 @@ from . import stmtctx
 from . import typegen
 
 
+class FunctionProps(typing.NamedTuple):
+
+    shortname: sn.Name
+    module_id: uuid.UUID
+    session_only: bool
+    params: s_func.FuncParameterList
+    return_type: s_types.Type
+    return_typemod: ft.TypeModifier
+    initial_value: typing.Optional[s_expr.Expression]
+    from_function: typing.Optional[str]
+    force_return_cast: bool
+    volatility: ft.Volatility
+    sql_func_has_out_params: bool
+    error_on_null_result: typing.Optional[str]
+
+
+class OperatorProps(typing.NamedTuple):
+
+    shortname: sn.Name
+    module_id: uuid.UUID
+    params: s_func.FuncParameterList
+    return_type: s_types.Type
+    return_typemod: ft.TypeModifier
+    operator_kind: ft.OperatorKind
+    from_operator: typing.Optional[typing.Tuple[str, ...]]
+    from_function: typing.Optional[str]
+    code: typing.Optional[str]
+    force_return_cast: bool
+    volatility: ft.Volatility
+    is_abstract: bool
+
+
+class CollectionOperators(typing.NamedTuple):
+
+    tuple_opers: typing.Tuple[s_oper.Operator, ...]
+    array_opers: typing.Tuple[s_oper.Operator, ...]
+
+
+@functools.lru_cache()
+def _get_collection_operators(
+        schema: s_schema.Schema,
+        opers: typing.Tuple[s_oper.Operator, ...]) -> CollectionOperators:
+    tuple_opers = []
+    array_opers = []
+
+    for op in opers:
+        param_types = [
+            param.get_type(schema)
+            for param in op.get_params(schema).objects(schema)
+        ]
+
+        if all(t.is_tuple() for t in param_types):
+            tuple_opers.append(op)
+        if all(t.is_array() for t in param_types):
+            array_opers.append(op)
+
+    return CollectionOperators(
+        tuple_opers=tuple(tuple_opers),
+        array_opers=tuple(array_opers),
+    )
+
+
+@functools.lru_cache()
+def _get_function_props(
+        schema: s_schema.Schema, func: s_func.Function) -> FunctionProps:
+    shortname = func.get_shortname(schema)
+    return FunctionProps(
+        shortname=shortname,
+        module_id=schema.get_global(s_mod.Module, shortname.module).id,
+        session_only=func.get_session_only(schema),
+        params=func.get_params(schema),
+        return_type=func.get_return_type(schema),
+        return_typemod=func.get_return_typemod(schema),
+        initial_value=func.get_initial_value(schema),
+        from_function=func.get_from_function(schema),
+        force_return_cast=func.get_force_return_cast(schema),
+        volatility=func.get_volatility(schema),
+        sql_func_has_out_params=func.get_sql_func_has_out_params(schema),
+        error_on_null_result=func.get_error_on_null_result(schema),
+    )
+
+
+@functools.lru_cache()
+def _get_operator_props(
+        schema: s_schema.Schema, oper: s_oper.Operator) -> OperatorProps:
+    shortname = oper.get_shortname(schema)
+    from_op = oper.get_from_operator(schema)
+    return OperatorProps(
+        shortname=shortname,
+        module_id=schema.get_global(s_mod.Module, shortname.module).id,
+        params=oper.get_params(schema),
+        return_type=oper.get_return_type(schema),
+        return_typemod=oper.get_return_typemod(schema),
+        operator_kind=oper.get_operator_kind(schema),
+        from_operator=tuple(from_op) if from_op is not None else None,
+        from_function=oper.get_from_function(schema),
+        code=oper.get_code(schema),
+        force_return_cast=oper.get_force_return_cast(schema),
+        volatility=oper.get_volatility(schema),
+        is_abstract=oper.get_is_abstract(schema),
+    )
+
+
 @dispatch.compile.register(qlast.FunctionCall)
 def compile_FunctionCall(
         expr: qlast.FunctionCall, *, ctx: context.ContextLevel) -> irast.Set:
 
     env = ctx.env
+    schema = env.schema
 
     if isinstance(expr.func, str):
-        if (ctx.env.func_params is not None
-                and ctx.env.func_params.get_by_name(env.schema, expr.func)):
+        if (env.func_params is not None
+                and env.func_params.get_by_name(schema, expr.func)):
             raise errors.QueryError(
                 f'parameter `{expr.func}` is not callable',
                 context=expr.context)
@@ -70,7 +178,7 @@ def compile_FunctionCall(
     else:
         funcname = sn.Name(expr.func[1], expr.func[0])
 
-    funcs = env.schema.get_functions(funcname, module_aliases=ctx.modaliases)
+    funcs = schema.get_functions(funcname, module_aliases=ctx.modaliases)
 
     if funcs is None:
         raise errors.QueryError(
@@ -78,13 +186,13 @@ def compile_FunctionCall(
             context=expr.context)
 
     in_polymorphic_func = (
-        ctx.env.func_params is not None and
-        ctx.env.func_params.has_polymorphic(env.schema)
+        env.func_params is not None and
+        env.func_params.has_polymorphic(schema)
     )
 
     in_abstract_constraint = (
         in_polymorphic_func and
-        ctx.env.parent_object_type is s_constr.Constraint
+        env.parent_object_type is s_constr.Constraint
     )
 
     args, kwargs = compile_call_args(expr, funcname, ctx=ctx)
@@ -105,31 +213,38 @@ def compile_FunctionCall(
 
     func = matched_call.func
     assert isinstance(func, s_func.Function)
-    func_name = func.get_shortname(env.schema)
+    # Use the schema the function was resolved in, rather than the one
+    # possibly updated by argument compilation, as the cache key.
+    fprops = _get_function_props(schema, func)
+    func_name = fprops.shortname
 
-    if not ctx.env.session_mode and func.get_session_only(env.schema):
+    if not ctx.env.session_mode and fprops.session_only:
         raise errors.QueryError(
             f'{func_name}() cannot be called in a non-session context',
             context=expr.context)
 
     final_args, params_typemods = finalize_args(matched_call, ctx=ctx)
+    # Argument compilation and casts may have derived new schema
+    # objects, so refresh the local schema reference.
+    schema = env.schema
 
-    matched_func_params = func.get_params(env.schema)
-    variadic_param = matched_func_params.find_variadic(env.schema)
+    matched_func_params = fprops.params
+    variadic_param = matched_func_params.find_variadic(schema)
     variadic_param_type = None
     if variadic_param is not None:
-        variadic_param_type = irtyputils.type_to_typeref(
-            env.schema,
-            variadic_param.get_type(env.schema))
+        variadic_param_type = typegen.type_to_typeref(
+            variadic_param.get_type(schema), ctx=ctx)
 
-    matched_func_ret_type = func.get_return_type(env.schema)
+    matched_func_ret_type = fprops.return_type
+    # Check the return type first, as it is a single lookup, and
+    # only scan the parameters if it is polymorphic.
     is_polymorphic = (
-        any(p.get_type(env.schema).is_polymorphic(env.schema)
-            for p in matched_func_params.objects(env.schema)) and
-        matched_func_ret_type.is_polymorphic(env.schema)
+        matched_func_ret_type.is_polymorphic(schema) and
+        any(p.get_type(schema).is_polymorphic(schema)
+            for p in matched_func_params.objects(schema))
     )
 
-    matched_func_initial_value = func.get_initial_value(env.schema)
+    matched_func_initial_value = fprops.initial_value
 
     if not in_abstract_constraint:
         # We cannot add strong references to functions from
@@ -141,13 +256,14 @@ def compile_FunctionCall(
 
     if matched_func_initial_value is not None:
         iv_ql = qlast.TypeCast(
-            expr=qlparser.parse_fragment(matched_func_initial_value.text),
+            expr=_parse_initial_value(matched_func_initial_value.text),
             type=typegen.type_to_ql_typeref(matched_call.return_type, ctx=ctx),
         )
         func_initial_value = setgen.ensure_set(
             dispatch.compile(iv_ql, ctx=ctx),
             ctx=ctx,
         )
+        schema = env.schema
     else:
         func_initial_value = None
 
@@ -157,40 +273,40 @@ def compile_FunctionCall(
     if rtype.is_tuple():
         rtype = typing.cast(s_types.Tuple, rtype)
         tuple_path_ids = []
-        nested_path_ids = []
-        for n, st in rtype.iter_subtypes(ctx.env.schema):
+        nested_path_ids: typing.List[irast.PathId] = []
+        for n, st in rtype.iter_subtypes(schema):
             elem_path_id = pathctx.get_tuple_indirection_path_id(
                 path_id, n, st, ctx=ctx).strip_weak_namespaces()
+            tuple_path_ids.append(elem_path_id)
 
             if st.is_tuple():
-                nested_path_ids.append([
+                # Nested element path ids go after all of the top-level
+                # ones, so collect them into a flat tail list.
+                nested_path_ids.extend(
                     pathctx.get_tuple_indirection_path_id(
                         elem_path_id, nn, sst, ctx=ctx).strip_weak_namespaces()
-                    for nn, sst in st.iter_subtypes(ctx.env.schema)
-                ])
+                    for nn, sst in st.iter_subtypes(schema)
+                )
 
-            tuple_path_ids.append(elem_path_id)
-        for nested in nested_path_ids:
-            tuple_path_ids.extend(nested)
+        tuple_path_ids.extend(nested_path_ids)
     else:
         tuple_path_ids = []
 
     fcall = irast.FunctionCall(
         args=final_args,
-        func_module_id=env.schema.get_global(
-            s_mod.Module, func_name.module).id,
+        func_module_id=fprops.module_id,
         func_shortname=func_name,
         func_polymorphic=is_polymorphic,
-        func_sql_function=func.get_from_function(env.schema),
-        force_return_cast=func.get_force_return_cast(env.schema),
-        session_only=func.get_session_only(env.schema),
-        volatility=func.get_volatility(env.schema),
-        sql_func_has_out_params=func.get_sql_func_has_out_params(env.schema),
-        error_on_null_result=func.get_error_on_null_result(env.schema),
+        func_sql_function=fprops.from_function,
+        force_return_cast=fprops.force_return_cast,
+        session_only=fprops.session_only,
+        volatility=fprops.volatility,
+        sql_func_has_out_params=fprops.sql_func_has_out_params,
+        error_on_null_result=fprops.error_on_null_result,
         params_typemods=params_typemods,
         context=expr.context,
-        typeref=irtyputils.type_to_typeref(env.schema, rtype),
-        typemod=matched_call.func.get_return_typemod(env.schema),
+        typeref=typegen.type_to_typeref(rtype, ctx=ctx),
+        typemod=fprops.return_typemod,
         has_empty_variadic=matched_call.has_empty_variadic,
         variadic_param_type=variadic_param_type,
         func_initial_value=func_initial_value,
@@ -200,12 +316,22 @@ def compile_FunctionCall(
     return setgen.ensure_set(fcall, typehint=rtype, path_id=path_id, ctx=ctx)
 
 
+def _parse_initial_value(text: str) -> qlast.Expr:
+    # The compiler keys some of its caches on QL AST nodes, so hand
+    # out a private copy of the cached tree on every call.
+    return copy.deepcopy(qlparser.parse_fragment_cached(text))
+
+
 def compile_operator(
         qlexpr: qlast.Base, op_name: str, qlargs: typing.List[qlast.Base], *,
         ctx: context.ContextLevel) -> irast.Set:
 
     env = ctx.env
     schema = env.schema
+    # Operator definitions are not affected by the schema changes made
+    # while compiling the operands, so remember the schema they were
+    # looked up in to get better hit rates from the schema-keyed caches.
+    opers_schema = schema
     opers = schema.get_operators(op_name, module_aliases=ctx.modaliases)
 
     if opers is None:
@@ -236,27 +362,30 @@ def compile_operator(
 
         args.append((arg_type, arg_ir))
 
+    # Operand compilation may have derived new schema objects.
+    schema = env.schema
+
     matched = None
     # Some 2-operand operators are special when their operands are
     # arrays or tuples.
     if len(args) == 2:
         coll_opers = None
+        larg_type = args[0][0]
+        rarg_type = args[1][0]
         # If both of the args are arrays or tuples, potentially
         # compile the operator for them differently than for other
         # combinations.
-        if args[0][0].is_tuple() and args[1][0].is_tuple():
+        if larg_type.is_tuple() and rarg_type.is_tuple():
             # Out of the candidate operators, find the ones that
             # correspond to tuples.
-            coll_opers = [op for op in opers
-                          if all(param.get_type(schema).is_tuple() for param
-                                 in op.get_params(schema).objects(schema))]
+            coll_opers = _get_collection_operators(
+                opers_schema, opers).tuple_opers
 
-        elif args[0][0].is_array() and args[1][0].is_array():
+        elif larg_type.is_array() and rarg_type.is_array():
             # Out of the candidate operators, find the ones that
             # correspond to arrays.
-            coll_opers = [op for op in opers
-                          if all(param.get_type(schema).is_array() for param
-                                 in op.get_params(schema).objects(schema))]
+            coll_opers = _get_collection_operators(
+                opers_schema, opers).array_opers
 
         # Proceed only if we have a special case of collection operators.
         if coll_opers:
@@ -277,7 +406,7 @@ def compile_operator(
                 # finding the callable.
                 matched = polyres.find_callable(
                     coll_opers,
-                    args=[(args[0][0], args[0][1]), (args[0][0], args[1][1])],
+                    args=[(larg_type, args[0][1]), (larg_type, args[1][1])],
                     kwargs={}, ctx=ctx)
 
                 # Now that we have an operator, we need to validate that it
@@ -297,33 +426,37 @@ def compile_operator(
         matched = polyres.find_callable(opers, args=args, kwargs={}, ctx=ctx)
 
     in_polymorphic_func = (
-        ctx.env.func_params is not None and
-        ctx.env.func_params.has_polymorphic(env.schema)
+        env.func_params is not None and
+        env.func_params.has_polymorphic(schema)
     )
 
     in_abstract_constraint = (
         in_polymorphic_func and
-        ctx.env.parent_object_type is s_constr.Constraint
+        env.parent_object_type is s_constr.Constraint
     )
 
-    if not in_polymorphic_func:
-        matched = [call for call in matched
-                   if not call.func.get_is_abstract(env.schema)]
+    if not in_polymorphic_func and matched:
+        # Even a single match must be checked here, as abstract
+        # operators cannot be used outside of polymorphic functions.
+        matched = [
+            call for call in matched
+            if not _get_operator_props(opers_schema, call.func).is_abstract
+        ]
 
     if len(matched) == 1:
         matched_call = matched[0]
     else:
         if len(args) == 2:
-            ltype = args[0][0].material_type(env.schema)
-            rtype = args[1][0].material_type(env.schema)
+            ltype = args[0][0].material_type(schema)
+            rtype = args[1][0].material_type(schema)
 
             types = (
-                f'{ltype.get_displayname(env.schema)!r} and '
-                f'{rtype.get_displayname(env.schema)!r}')
+                f'{ltype.get_displayname(schema)!r} and '
+                f'{rtype.get_displayname(schema)!r}')
         else:
             types = ', '.join(
                 repr(
-                    a[0].material_type(env.schema).get_displayname(env.schema)
+                    a[0].material_type(schema).get_displayname(schema)
                 ) for a in args
             )
 
@@ -346,7 +479,7 @@ def compile_operator(
                 matched_call = matched[0]
             else:
                 detail = ', '.join(
-                    f'`{m.func.get_verbosename(ctx.env.schema)}`'
+                    f'`{m.func.get_verbosename(schema)}`'
                     for m in matched
                 )
                 raise errors.QueryError(
@@ -356,13 +489,16 @@ def compile_operator(
                     context=qlexpr.context)
 
     final_args, params_typemods = finalize_args(matched_call, ctx=ctx)
+    # Argument casts may have derived new schema objects.
+    schema = env.schema
 
     oper = matched_call.func
     assert isinstance(oper, s_oper.Operator)
     env.schema_refs.add(oper)
-    oper_name = oper.get_shortname(env.schema)
+    oprops = _get_operator_props(opers_schema, oper)
+    oper_name = oprops.shortname
 
-    matched_params = oper.get_params(env.schema)
+    matched_params = oprops.params
     rtype = matched_call.return_type
 
     if oper_name in {'std::UNION', 'std::IF'} and rtype.is_object_type():
@@ -374,46 +510,46 @@ def compile_operator(
             larg, _, rarg = (a.expr for a in final_args)
 
         left_type = setgen.get_set_type(larg, ctx=ctx).material_type(
-            ctx.env.schema)
+            schema)
         right_type = setgen.get_set_type(rarg, ctx=ctx).material_type(
-            ctx.env.schema)
+            schema)
 
-        if left_type.issubclass(env.schema, right_type):
+        if left_type.issubclass(schema, right_type):
             rtype = right_type
-        elif right_type.issubclass(env.schema, left_type):
+        elif right_type.issubclass(schema, left_type):
             rtype = left_type
         else:
-            env.schema, rtype = s_utils.get_union_type(
-                env.schema, [left_type, right_type])
+            schema, rtype = s_utils.get_union_type(
+                schema, [left_type, right_type])
+            env.schema = schema
 
     is_polymorphic = (
-        any(p.get_type(env.schema).is_polymorphic(env.schema)
-            for p in matched_params.objects(env.schema)) and
-        oper.get_return_type(env.schema).is_polymorphic(env.schema)
+        oprops.return_type.is_polymorphic(schema) and
+        any(p.get_type(schema).is_polymorphic(schema)
+            for p in matched_params.objects(schema))
     )
 
-    from_op = oper.get_from_operator(env.schema)
+    from_op = oprops.from_operator
     sql_operator = None
-    if (from_op is not None and oper.get_code(env.schema) is None and
-            oper.get_from_function(env.schema) is None and
+    if (from_op is not None and oprops.code is None and
+            oprops.from_function is None and
             not in_polymorphic_func):
-        sql_operator = tuple(from_op)
+        sql_operator = from_op
 
     node = irast.OperatorCall(
         args=final_args,
-        func_module_id=env.schema.get_global(
-            s_mod.Module, oper_name.module).id,
+        func_module_id=oprops.module_id,
         func_shortname=oper_name,
         func_polymorphic=is_polymorphic,
-        func_sql_function=oper.get_from_function(env.schema),
+        func_sql_function=oprops.from_function,
         sql_operator=sql_operator,
-        force_return_cast=oper.get_force_return_cast(env.schema),
-        volatility=oper.get_volatility(env.schema),
-        operator_kind=oper.get_operator_kind(env.schema),
+        force_return_cast=oprops.force_return_cast,
+        volatility=oprops.volatility,
+        operator_kind=oprops.operator_kind,
         params_typemods=params_typemods,
         context=qlexpr.context,
-        typeref=irtyputils.type_to_typeref(env.schema, rtype),
-        typemod=oper.get_return_typemod(env.schema),
+        typeref=typegen.type_to_typeref(rtype, ctx=ctx),
+        typemod=oprops.return_typemod,
     )
 
     return setgen.ensure_set(node, typehint=rtype, ctx=ctx)
@@ -426,14 +562,25 @@ def validate_recursive_operator(
         ctx: context.ContextLevel) -> typing.List[polyres.BoundCall]:
 
     matched: typing.List[polyres.BoundCall] = []
+    ltype = larg[0]
+    rtype = rarg[0]
 
     # if larg and rarg are tuples or arrays, recurse into their subtypes
-    if (larg[0].is_tuple() and rarg[0].is_tuple() or
-            larg[0].is_array() and rarg[0].is_array()):
-        assert isinstance(larg[0], s_types.Collection)
-        assert isinstance(rarg[0], s_types.Collection)
-        for rsub, lsub in zip(larg[0].get_subtypes(ctx.env.schema),
-                              rarg[0].get_subtypes(ctx.env.schema)):
+    if (ltype.is_tuple() and rtype.is_tuple() or
+            ltype.is_array() and rtype.is_array()):
+        assert isinstance(ltype, s_types.Collection)
+        assert isinstance(rtype, s_types.Collection)
+        schema = ctx.env.schema
+        validated: typing.Set[typing.Tuple[s_types.Type, s_types.Type]] = set()
+        for rsub, lsub in zip(ltype.get_subtypes(schema),
+                              rtype.get_subtypes(schema)):
+            # Equal subtype pairs always resolve to the same operator
+            # (think `tuple<int64, int64>` or comparing a value with
+            # itself), so there is no need to validate them again.
+            if (lsub, rsub) in validated:
+                continue
+            validated.add((lsub, rsub))
+
             matched = validate_recursive_operator(
                 opers, (lsub, larg[1]), (rsub, rarg[1]), ctx=ctx)
             if len(matched) != 1:
@@ -509,6 +656,9 @@ def finalize_args(
     typemods = []
 
     for barg in bound_call.args:
+        # Casts compiled for previous arguments may have updated
+        # the schema, so re-read it on every iteration.
+        schema = ctx.env.schema
         param = barg.param
         arg = barg.val
         if param is None:
@@ -517,12 +667,12 @@ def finalize_args(
             typemods.append(ft.TypeModifier.SINGLETON)
             continue
 
-        param_mod = param.get_typemod(ctx.env.schema)
+        param_mod = param.get_typemod(schema)
         typemods.append(param_mod)
 
         if param_mod is not ft.TypeModifier.SET_OF:
             arg_scope = pathctx.get_set_scope(arg, ctx=ctx)
-            param_shortname = param.get_shortname(ctx.env.schema)
+            param_shortname = param.get_shortname(schema)
 
             # Arg was wrapped for scope fencing purposes,
             # but that fence has been removed above, so unwrap it.
@@ -550,25 +700,28 @@ def finalize_args(
                     pathctx.assign_set_scope(arg, None, ctx=ctx)
 
         paramtype = barg.param_type
-        param_kind = param.get_kind(ctx.env.schema)
+        param_kind = param.get_kind(schema)
         if param_kind is ft.ParameterKind.VARIADIC:
             # For variadic params, paramtype would be array<T>,
             # and we need T to cast the arguments.
             assert isinstance(paramtype, s_types.Array)
-            paramtype = list(paramtype.get_subtypes(ctx.env.schema))[0]
-
-        val_material_type = barg.valtype.material_type(ctx.env.schema)
-        param_material_type = paramtype.material_type(ctx.env.schema)
+            paramtype = list(paramtype.get_subtypes(schema))[0]
 
         # Check if we need to cast the argument value before passing
         # it to the callable.  For tuples, we also check that the element
         # names match.
-        compatible = (
-            val_material_type.issubclass(ctx.env.schema, param_material_type)
-            and (not param_material_type.is_tuple()
-                 or (param_material_type.get_element_names(ctx.env.schema) ==
-                     val_material_type.get_element_names(ctx.env.schema)))
-        )
+        if barg.valtype is paramtype:
+            compatible = True
+        else:
+            val_material_type = barg.valtype.material_type(schema)
+            param_material_type = paramtype.material_type(schema)
+
+            compatible = (
+                val_material_type.issubclass(schema, param_material_type)
+                and (not param_material_type.is_tuple()
+                     or (param_material_type.get_element_names(schema) ==
+                         val_material_type.get_element_names(schema)))
+            )
 
         if not compatible:
             # The callable form was chosen via an implicit cast,
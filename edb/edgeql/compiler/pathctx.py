@@ -22,6 +22,7 @@
 
 from __future__ import annotations
 
+import functools
 from typing import *  # NoQA
 
 from edb import errors
@@ -41,10 +42,22 @@ from . import stmtctx
 def get_path_id(stype: s_obj.Object, *,
                 typename: Optional[str]=None,
                 ctx: context.ContextLevel) -> irast.PathId:
-    return irast.PathId.from_type(
-        ctx.env.schema, stype,
-        typename=typename,
-        namespace=ctx.path_id_namespace)
+    env = ctx.env
+    key = (env.schema, stype, typename, ctx.path_id_namespace)
+    path_id = env.path_id_cache.get(key)
+    if path_id is None:
+        path_id = irast.PathId.from_type(
+            env.schema, stype,
+            typename=typename,
+            namespace=ctx.path_id_namespace)
+        env.path_id_cache[key] = path_id
+    return path_id
+
+
+@functools.lru_cache()
+def _get_tuple_indirection_link(
+        element_name: str) -> irast.TupleIndirectionLink:
+    return irast.TupleIndirectionLink(element_name)
 
 
 def get_tuple_indirection_path_id(
@@ -52,7 +65,7 @@ def get_tuple_indirection_path_id(
         element_type: s_types.Type, *,
         ctx: context.ContextLevel) -> irast.PathId:
     return tuple_path_id.extend(
-        ptrcls=irast.TupleIndirectionLink(element_name),
+        ptrcls=_get_tuple_indirection_link(element_name),
         direction=s_pointers.PointerDirection.Outbound,
         target=element_type,
         schema=ctx.env.schema
@@ -75,13 +88,23 @@ def get_type_indirection_path_id(
     )
 
 
+@functools.lru_cache(1024)
+def _get_derived_name(alias: str) -> s_name.Name:
+    return s_name.Name(module='__derived__', name=alias)
+
+
 def get_expression_path_id(
         stype: s_types.Type, alias: Optional[str] = None, *,
         ctx: context.ContextLevel) -> irast.PathId:
     if alias is None:
         alias = ctx.aliases.get('expr')
-    typename = s_name.Name(module='__derived__', name=alias)
-    return get_path_id(stype, typename=typename, ctx=ctx)
+    typename = _get_derived_name(alias)
+    # Expression aliases are unique, so there is no point in
+    # going through the path id cache here.
+    return irast.PathId.from_type(
+        ctx.env.schema, stype,
+        typename=typename,
+        namespace=ctx.path_id_namespace)
 
 
 def register_set_in_scope(
@@ -104,9 +127,10 @@ def assign_set_scope(
     if scope is None:
         ir_set.path_scope_id = None
     else:
-        if scope.unique_id is None:
-            scope.unique_id = ctx.scope_id_ctr.nextval()
-        ir_set.path_scope_id = scope.unique_id
+        unique_id = scope.unique_id
+        if unique_id is None:
+            unique_id = scope.unique_id = ctx.scope_id_ctr.nextval()
+        ir_set.path_scope_id = unique_id
         if scope.find_child(ir_set.path_id):
             raise RuntimeError('scoped set must not contain itself')
 
@@ -116,10 +140,11 @@ def assign_set_scope(
 def get_set_scope(
         ir_set: irast.Set, *,
         ctx: context.ContextLevel) -> Optional[irast.ScopeTreeNode]:
-    if ir_set.path_scope_id is None:
+    path_scope_id = ir_set.path_scope_id
+    if path_scope_id is None:
         return None
     else:
-        return ctx.path_scope.root.find_by_unique_id(ir_set.path_scope_id)
+        return ctx.path_scope.root.find_by_unique_id(path_scope_id)
 
 
 def mark_path_as_optional(
@@ -153,5 +178,11 @@ def path_is_banned(
         path_id: irast.PathId, *,
         ctx: context.ContextLevel) -> bool:
 
+    banned_paths = ctx.banned_paths
+    if not banned_paths:
+        # Only INSERT subjects are ever banned, so this is by far
+        # the most common case.
+        return False
+
     s_path_id = path_id.strip_weak_namespaces()
-    return s_path_id in ctx.banned_paths and ctx.path_scope.is_visible(path_id)
+    return s_path_id in banned_paths and ctx.path_scope.is_visible(path_id)
@@ -53,10 +53,13 @@ from . import schemactx
 from . import stmtctx
 
 
+_NONVERBOSE_TEXT_REF_CLASSES = (s_links.Link, s_lprops.Property)
+
+
 @dispatch.compile.register(qlast.SelectQuery)
 def compile_SelectQuery(
         expr: qlast.SelectQuery, *, ctx: context.ContextLevel) -> irast.Set:
-    if astutils.is_degenerate_select(expr) and ctx.toplevel_stmt is not None:
+    if ctx.toplevel_stmt is not None and astutils.is_degenerate_select(expr):
         # Compile implicit "SELECT Path" as "Path"
         with ctx.new() as sctx:
             process_with_block(expr, ctx=sctx, parent_ctx=ctx)
@@ -132,8 +135,13 @@ def compile_ForQuery(
 
             iterator_scope = scopectx.path_scope_map.get(iterator_view)
 
+        iterator_path_id = stmt.iterator_stmt.path_id
         pathctx.register_set_in_scope(stmt.iterator_stmt, ctx=sctx)
-        node = sctx.path_scope.find_descendant(stmt.iterator_stmt.path_id)
+        # The iterator set normally ends up as a direct child of the
+        # statement scope, so check there before searching the subtree.
+        node = sctx.path_scope.find_child(iterator_path_id)
+        if node is None:
+            node = sctx.path_scope.find_descendant(iterator_path_id)
         node.attach_subtree(iterator_scope)
 
         stmt.result = compile_result_clause(
@@ -246,16 +254,17 @@ def compile_InsertQuery(
         pathctx.ban_path(subject.path_id, ctx=ictx)
 
         subject_stype = setgen.get_set_type(subject, ctx=ictx)
-        if subject_stype.get_is_abstract(ctx.env.schema):
+        schema = ctx.env.schema
+        if subject_stype.get_is_abstract(schema):
             raise errors.QueryError(
                 f'cannot insert into abstract '
-                f'{subject_stype.get_verbosename(ctx.env.schema)}',
+                f'{subject_stype.get_verbosename(schema)}',
                 context=expr.subject.context)
 
-        if subject_stype.is_view(ctx.env.schema):
+        if subject_stype.is_view(schema):
             raise errors.QueryError(
                 f'cannot insert into view '
-                f'{subject_stype.get_shortname(ctx.env.schema)!r}',
+                f'{subject_stype.get_shortname(schema)!r}',
                 context=expr.subject.context)
 
         stmt.subject = compile_query_subject(
@@ -267,10 +276,8 @@ def compile_InsertQuery(
             is_insert=True,
             ctx=ictx)
 
-        stmt_subject_stype = setgen.get_set_type(subject, ctx=ictx)
-
         result = setgen.class_set(
-            stmt_subject_stype.material_type(ctx.env.schema),
+            subject_stype.material_type(ctx.env.schema),
             path_id=stmt.subject.path_id, ctx=ctx)
 
         stmt.result = compile_query_subject(
@@ -319,10 +326,8 @@ def compile_UpdateQuery(
             is_update=True,
             ctx=ictx)
 
-        stmt_subject_stype = setgen.get_set_type(subject, ctx=ictx)
-
         result = setgen.class_set(
-            stmt_subject_stype.material_type(ctx.env.schema),
+            subj_type.material_type(ctx.env.schema),
             path_id=stmt.subject.path_id, ctx=ctx)
 
         stmt.result = compile_query_subject(
@@ -347,31 +352,24 @@ def compile_DeleteQuery(
         stmt = irast.DeleteStmt()
         # Expand the DELETE from sugar into full DELETE (SELECT ...)
         # form, if there's any additional clauses.
-        if any([expr.where, expr.orderby, expr.offset, expr.limit]):
-            if expr.offset or expr.limit:
+        has_offset_or_limit = bool(expr.offset or expr.limit)
+        if expr.where or expr.orderby or has_offset_or_limit:
+            subjql = qlast.SelectQuery(
+                result=expr.subject,
+                result_alias=expr.subject_alias,
+                where=expr.where,
+                orderby=expr.orderby,
+                context=expr.context,
+                implicit=has_offset_or_limit,
+            )
+
+            if has_offset_or_limit:
                 subjql = qlast.SelectQuery(
-                    result=qlast.SelectQuery(
-                        result=expr.subject,
-                        result_alias=expr.subject_alias,
-                        where=expr.where,
-                        orderby=expr.orderby,
-                        context=expr.context,
-                        implicit=True,
-                    ),
+                    result=subjql,
                     limit=expr.limit,
                     offset=expr.offset,
                     context=expr.context,
                 )
-            else:
-                subjql = qlast.SelectQuery(
-                    result=expr.subject,
-                    result_alias=expr.subject_alias,
-                    where=expr.where,
-                    orderby=expr.orderby,
-                    offset=expr.offset,
-                    limit=expr.limit,
-                    context=expr.context,
-                )
 
             expr = qlast.DeleteQuery(
                 aliases=expr.aliases,
@@ -395,9 +393,8 @@ def compile_DeleteQuery(
 
         stmt.subject = compile_query_subject(subject, shape=None, ctx=ictx)
 
-        stmt_subject_stype = setgen.get_set_type(subject, ctx=ictx)
         result = setgen.class_set(
-            stmt_subject_stype.material_type(ctx.env.schema),
+            subj_type.material_type(ctx.env.schema),
             path_id=stmt.subject.path_id, ctx=ctx)
 
         stmt.result = compile_query_subject(
@@ -429,7 +426,7 @@ def compile_DescribeStmt(
         else:
             modules = []
             items = []
-            referenced_classes: List[s_obj.ObjectMeta] = []
+            referenced_classes: Tuple[s_obj.ObjectMeta, ...] = ()
 
             objref = ql.object
 
@@ -458,7 +455,7 @@ def compile_DescribeStmt(
             elif ql.language is qltypes.DescribeLanguage.TEXT:
                 method = s_ddl.descriptive_text_from_schema
                 if not ql.verbose:
-                    referenced_classes = [s_links.Link, s_lprops.Property]
+                    referenced_classes = _NONVERBOSE_TEXT_REF_CLASSES
             else:
                 raise errors.InternalServerError(
                     f'cannot handle describe language {ql.language}'
@@ -593,7 +590,8 @@ def compile_result_clause(
         ctx: context.ContextLevel) -> irast.Set:
     with ctx.new() as sctx:
         sctx.clause = 'result'
-        if sctx.stmt is ctx.toplevel_stmt:
+        is_toplevel = sctx.stmt is ctx.toplevel_stmt
+        if is_toplevel:
             sctx.toplevel_clause = sctx.clause
             sctx.expr_exposed = True
 
@@ -625,39 +623,16 @@ def compile_result_clause(
                 steps=[qlast.ObjectRef(name=result_alias)]
             )
 
-        if (view_rptr is not None and
-                (view_rptr.is_insert or view_rptr.is_update) and
-                view_rptr.ptrcls is not None) and False:
-            # If we have an empty set assigned to a pointer in an INSERT
-            # or UPDATE, there's no need to explicitly specify the
-            # empty set type and it can be assumed to match the pointer
-            # target type.
-            target_t = view_rptr.ptrcls.get_target(ctx.env.schema)
-
-            if astutils.is_ql_empty_set(result_expr):
-                expr = setgen.new_empty_set(
-                    stype=target_t,
-                    alias=ctx.aliases.get('e'),
-                    ctx=sctx,
-                    srcctx=result_expr.context,
-                )
-            else:
-                with sctx.new() as exprctx:
-                    exprctx.empty_result_type_hint = target_t
-                    expr = setgen.ensure_set(
-                        dispatch.compile(result_expr, ctx=exprctx),
-                        ctx=exprctx)
+        if astutils.is_ql_empty_set(result_expr):
+            expr = setgen.new_empty_set(
+                stype=sctx.empty_result_type_hint,
+                alias=ctx.aliases.get('e'),
+                ctx=sctx,
+                srcctx=result_expr.context,
+            )
         else:
-            if astutils.is_ql_empty_set(result_expr):
-                expr = setgen.new_empty_set(
-                    stype=sctx.empty_result_type_hint,
-                    alias=ctx.aliases.get('e'),
-                    ctx=sctx,
-                    srcctx=result_expr.context,
-                )
-            else:
-                expr = setgen.ensure_set(
-                    dispatch.compile(result_expr, ctx=sctx), ctx=sctx)
+            expr = setgen.ensure_set(
+                dispatch.compile(result_expr, ctx=sctx), ctx=sctx)
 
         ctx.partial_path_prefix = expr
 
@@ -665,7 +640,7 @@ def compile_result_clause(
             expr, shape=shape, view_rptr=view_rptr, view_name=view_name,
             result_alias=result_alias,
             view_scls=view_scls,
-            compile_views=ctx.stmt is ctx.toplevel_stmt,
+            compile_views=is_toplevel,
             ctx=sctx)
 
         ctx.partial_path_prefix = ir_result
@@ -686,32 +661,27 @@ def compile_query_subject(
         ctx: context.ContextLevel) -> irast.Set:
 
     expr_stype = setgen.get_set_type(expr, ctx=ctx)
-    expr_rptr = expr.rptr
-
-    while isinstance(expr_rptr, irast.TypeIndirectionPointer):
-        expr_rptr = expr_rptr.source.rptr
-
-    is_ptr_alias = (
-        view_rptr is not None
-        and view_rptr.ptrcls is None
-        and view_rptr.ptrcls_name is not None
-        and expr_rptr is not None
-        and expr_rptr.direction is s_pointers.PointerDirection.Outbound
-        and (
-            view_rptr.ptrcls_is_linkprop
-            == (expr_rptr.ptrref.parent_ptr is not None)
-        )
-    )
-
-    if is_ptr_alias:
-        assert view_rptr is not None
-        # We are inside an expression that defines a link alias in
-        # the parent shape, ie. Spam { alias := Spam.bar }, so
-        # `Spam.alias` should be a subclass of `Spam.bar` inheriting
-        # its properties.
-        view_rptr.base_ptrcls = irtyputils.ptrcls_from_ptrref(
-            expr_rptr.ptrref, schema=ctx.env.schema)
-        view_rptr.ptrcls_is_alias = True
+
+    if (view_rptr is not None
+            and view_rptr.ptrcls is None
+            and view_rptr.ptrcls_name is not None):
+        expr_rptr = expr.rptr
+        while isinstance(expr_rptr, irast.TypeIndirectionPointer):
+            expr_rptr = expr_rptr.source.rptr
+
+        if (expr_rptr is not None
+                and expr_rptr.direction is s_pointers.PointerDirection.Outbound
+                and (
+                    view_rptr.ptrcls_is_linkprop
+                    == (expr_rptr.ptrref.parent_ptr is not None)
+                )):
+            # We are inside an expression that defines a link alias in
+            # the parent shape, ie. Spam { alias := Spam.bar }, so
+            # `Spam.alias` should be a subclass of `Spam.bar` inheriting
+            # its properties.
+            view_rptr.base_ptrcls = irtyputils.ptrcls_from_ptrref(
+                expr_rptr.ptrref, schema=ctx.env.schema)
+            view_rptr.ptrcls_is_alias = True
 
     if (ctx.expr_exposed
             and viewgen.has_implicit_tid(
@@ -760,12 +730,11 @@ def compile_groupby_clause(
         if sctx.stmt.parent_stmt is None:
             sctx.toplevel_clause = sctx.clause
 
-        ir_groupexprs = []
         for groupexpr in groupexprs:
             with sctx.newscope(fenced=True) as scopectx:
                 ir_groupexpr = setgen.scoped_set(
                     dispatch.compile(groupexpr, ctx=scopectx), ctx=scopectx)
                 ir_groupexpr.context = groupexpr.context
-                ir_groupexprs.append(ir_groupexpr)
+                result.append(ir_groupexpr)
 
-    return ir_groupexprs
+    return result
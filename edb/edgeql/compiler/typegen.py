@@ -49,6 +49,21 @@ def type_to_ql_typeref(t: s_types.Type, *,
     return astutils.type_to_ql_typeref(t, schema=ctx.env.schema)
 
 
+def type_to_typeref(
+        t: s_types.Type, *,
+        ctx: context.ContextLevel) -> irast.TypeRef:
+
+    env = ctx.env
+    schema = env.schema
+    cache_key = (schema, t)
+    typeref = env.type_ref_cache.get(cache_key)
+    if typeref is None:
+        typeref = irtyputils.type_to_typeref(schema, t)
+        env.type_ref_cache[cache_key] = typeref
+
+    return typeref
+
+
 def ql_typeexpr_to_ir_typeref(
         ql_t: qlast.TypeExpr, *,
         ctx: context.ContextLevel) -> irast.TypeRef:
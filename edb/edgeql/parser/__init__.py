@@ -19,6 +19,8 @@
 
 from __future__ import annotations
 
+import functools
+
 from . import parser as ql_parser
 from .. import ast as qlast
 
@@ -28,6 +30,16 @@ def parse_fragment(expr):
     return parser.parse(expr)
 
 
+@functools.lru_cache(1024)
+def parse_fragment_cached(expr):
+    """Return the parse_fragment() tree for *expr* from a cache.
+
+    The returned tree is shared between callers and must not be
+    modified: use copy.deepcopy() on it if it needs to be rewritten.
+    """
+    return parse_fragment(expr)
+
+
 def append_module_aliases(tree, aliases):
     modaliases = []
     for alias, module in aliases.items():
@@ -31,7 +31,7 @@ class PathId:
     """Unique identifier of a path in an expression."""
 
     __slots__ = ('_path', '_norm_path', '_namespace', '_prefix',
-                 '_is_ptr', '_is_linkprop')
+                 '_is_ptr', '_is_linkprop', '_weak_stripped', '_hash')
 
     def __init__(self, initializer=None, *, namespace=None, typename=None):
         if isinstance(initializer, PathId):
@@ -44,6 +44,8 @@ class PathId:
             self._is_ptr = initializer._is_ptr
             self._is_linkprop = initializer._is_linkprop
             self._prefix = initializer._prefix
+            self._weak_stripped = None
+            self._hash = None
         elif initializer is not None:
             raise TypeError('use PathId.from_type')
         else:
@@ -53,6 +55,8 @@ class PathId:
             self._prefix = None
             self._is_ptr = False
             self._is_linkprop = False
+            self._weak_stripped = None
+            self._hash = None
 
     @classmethod
     def from_type(cls, schema, initializer, *, namespace=None, typename=None):
@@ -76,9 +80,11 @@ class PathId:
         return pid
 
     def __hash__(self):
-        return hash((
-            self.__class__, self._norm_path,
-            self._namespace, self._prefix, self._is_ptr))
+        if self._hash is None:
+            self._hash = hash((
+                self.__class__, self._norm_path,
+                self._namespace, self._prefix, self._is_ptr))
+        return self._hash
 
     def __eq__(self, other):
         if not isinstance(other, PathId):
@@ -161,6 +167,9 @@ class PathId:
         return prefix
 
     def strip_weak_namespaces(self):
+        if self._weak_stripped is not None:
+            return self._weak_stripped
+
         if self._namespace is not None:
             stripped_ns = tuple(bit for bit in self._namespace
                                 if not isinstance(bit, WeakNamespace))
@@ -170,13 +179,17 @@ class PathId:
                 result._prefix = result._get_minimal_prefix(
                     result._prefix.strip_weak_namespaces())
 
+            self._weak_stripped = result
+
         else:
             result = self
 
         return result
 
     def strip_namespace(self, namespace):
-        if self._namespace and namespace:
+        if (self._namespace and namespace
+                and (self._prefix is not None
+                     or not self._namespace.isdisjoint(namespace))):
             stripped_ns = self._namespace - set(namespace)
             result = self.replace_namespace(stripped_ns)
 
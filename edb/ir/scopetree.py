@@ -21,6 +21,7 @@
 
 from __future__ import annotations
 
+import itertools
 import textwrap
 from typing import *  # NoQA
 import weakref
@@ -38,11 +39,10 @@ class InvalidScopeConfiguration(Exception):
 
 
 class ScopeTreeNode:
-    unique_id: Optional[int]
-    """A unique identifier used to map scopes on sets."""
-
-    path_id: Optional[pathid.PathId]
-    """Node path id, or None for branch nodes."""
+    __slots__ = ('_unique_id', '_path_id', 'fenced', 'protect_parent',
+                 'unnest_fence', 'optional', 'children', 'namespaces',
+                 '_parent', '_children_by_path_id', '_children_by_unique_id',
+                 '_unique_id_index', '__weakref__')
 
     fenced: bool
     """Whether the subtree represents a SET OF argument."""
@@ -56,10 +56,10 @@ class ScopeTreeNode:
     optional: bool
     """Whether this node represents an optional path."""
 
-    children: Set[ScopeTreeNode]
-    """A set of child nodes."""
+    children: Dict[ScopeTreeNode, None]
+    """An insertion-ordered set of child nodes."""
 
-    namespaces: Set[str]
+    namespaces: FrozenSet[str]
     """A set of namespaces used by paths in this branch.
 
     When a path node is pulled up from this branch,
@@ -70,34 +70,60 @@ class ScopeTreeNode:
 
     def __init__(self, *, path_id: Optional[pathid.PathId]=None,
                  fenced: bool=False, unique_id: Optional[int]=None):
-        self.unique_id = unique_id
-        self.path_id = path_id
+        self._unique_id = unique_id
+        self._path_id = path_id
         self.fenced = fenced
         self.protect_parent = False
         self.unnest_fence = False
         self.optional = False
-        self.children = set()
-        self.namespaces = set()
+        self.children = {}
+        self.namespaces = frozenset()
         self._parent = None
+        self._children_by_path_id = {}
+        self._children_by_unique_id = {}
+        self._unique_id_index = None
 
     def __repr__(self):
         name = 'ScopeFenceNode' if self.fenced else 'ScopeTreeNode'
         return (f'<{name} {self.path_id!r} at {id(self):0x}>')
 
-    def _copy(self, parent: ScopeTreeNode) -> ScopeTreeNode:
+    def _copy_node(self) -> ScopeTreeNode:
         cp = self.__class__(
             path_id=self.path_id,
-            fenced=self.fenced)
+            fenced=self.fenced,
+            unique_id=self.unique_id)
         cp.optional = self.optional
         cp.unnest_fence = self.unnest_fence
-        cp.namespaces = set(self.namespaces)
-        cp.unique_id = self.unique_id
-        cp._set_parent(parent)
+        cp.namespaces = self.namespaces
+        return cp
 
-        for child in self.children:
-            child._copy(parent=cp)
+    @property
+    def unique_id(self) -> Optional[int]:
+        """A unique identifier used to map scopes on sets."""
+        return self._unique_id
 
-        return cp
+    @unique_id.setter
+    def unique_id(self, unique_id: Optional[int]) -> None:
+        parent = self.parent
+        if parent is not None:
+            parent._unindex_child(self)
+        self._unique_id = unique_id
+        if parent is not None:
+            parent._index_child(self)
+
+    @property
+    def path_id(self) -> Optional[pathid.PathId]:
+        """Node path id, or None for branch nodes."""
+        return self._path_id
+
+    @path_id.setter
+    def path_id(self, path_id: Optional[pathid.PathId]) -> None:
+        parent = self.parent
+        if parent is not None:
+            parent._unindex_child(self)
+        self._path_id = path_id
+        if parent is not None:
+            parent._index_child(self)
 
     @property
     def name(self):
@@ -127,15 +153,18 @@ class ScopeTreeNode:
         node = self
         while node is not None:
             yield node
-            node = node.parent
+            parent_ref = node._parent
+            node = parent_ref() if parent_ref is not None else None
 
     @property
     def strict_ancestors(self) -> Iterator[ScopeTreeNode]:
         """An iterator of node's ancestors, not including self."""
-        node = self.parent
+        parent_ref = self._parent
+        node = parent_ref() if parent_ref is not None else None
         while node is not None:
             yield node
-            node = node.parent
+            parent_ref = node._parent
+            node = parent_ref() if parent_ref is not None else None
 
     @property
     def ancestors_and_namespaces(self) \
@@ -144,9 +173,11 @@ class ScopeTreeNode:
         namespaces = frozenset()
         node = self
         while node is not None:
-            namespaces |= node.namespaces
+            if node.namespaces:
+                namespaces |= node.namespaces
             yield node, namespaces
-            node = node.parent
+            parent_ref = node._parent
+            node = parent_ref() if parent_ref is not None else None
 
     @property
     def path_children(self) -> Iterator[ScopeTreeNode]:
@@ -172,9 +203,11 @@ class ScopeTreeNode:
     @property
     def strict_descendants(self) -> Iterator[ScopeTreeNode]:
         """An iterator of node's descendants not including self top-first."""
-        for child in tuple(self.children):
-            yield child
-            yield from child.strict_descendants
+        stack = list(reversed(tuple(self.children)))
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(reversed(tuple(node.children)))
 
     @property
     def strict_descendants_and_namespaces(self) \
@@ -183,11 +216,17 @@ class ScopeTreeNode:
 
         Does not include self. Top-first.
         """
-        for child in tuple(self.children):
-            yield child, child.namespaces
-            desc_ns = child.strict_descendants_and_namespaces
-            for desc, desc_namespaces in desc_ns:
-                yield desc, child.namespaces | desc_namespaces
+        empty: FrozenSet[str] = frozenset()
+        stack = [(child, empty) for child in reversed(tuple(self.children))]
+        while stack:
+            node, namespaces = stack.pop()
+            if node.namespaces:
+                namespaces = namespaces | node.namespaces
+            yield node, namespaces
+            stack.extend(
+                (child, namespaces)
+                for child in reversed(tuple(node.children))
+            )
 
     @property
     def path_descendants(self) -> Iterator[ScopeTreeNode]:
@@ -200,9 +239,13 @@ class ScopeTreeNode:
     @property
     def descendant_namespaces(self) -> Set[str]:
         """An set of namespaces declared by descendants."""
-        namespaces = set()
-        for child in self.descendants:
-            namespaces.update(child.namespaces)
+        namespaces = set(self.namespaces)
+        stack = list(self.children)
+        while stack:
+            node = stack.pop()
+            if node.namespaces:
+                namespaces.update(node.namespaces)
+            stack.extend(node.children)
 
         return namespaces
 
@@ -210,16 +253,17 @@ class ScopeTreeNode:
     def unfenced_descendants(self) -> Iterator[ScopeTreeNode]:
         """An iterator of node's unfenced descendants including self."""
         yield self
-        for child in tuple(self.children):
-            if not child.fenced:
-                yield from child.unfenced_descendants
+        yield from self.strict_unfenced_descendants
 
     @property
     def strict_unfenced_descendants(self) -> Iterator[ScopeTreeNode]:
         """An iterator of node's unfenced descendants."""
-        for child in tuple(self.children):
-            if not child.fenced:
-                yield from child.unfenced_descendants
+        stack = [c for c in reversed(tuple(self.children)) if not c.fenced]
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(
+                c for c in reversed(tuple(node.children)) if not c.fenced)
 
     @property
     def fence(self) -> ScopeTreeNode:
@@ -240,9 +284,12 @@ class ScopeTreeNode:
     @property
     def parent_fence(self) -> Optional[ScopeTreeNode]:
         """The nearest strict ancestor fence."""
-        for ancestor in self.strict_ancestors:
-            if ancestor.fenced:
-                return ancestor
+        parent_ref = self._parent
+        while parent_ref is not None:
+            node = parent_ref()
+            if node is None or node.fenced:
+                return node
+            parent_ref = node._parent
 
         return None
 
@@ -250,8 +297,13 @@ class ScopeTreeNode:
     def root(self) -> ScopeTreeNode:
         """The root of this tree."""
         node = self
-        while node.parent is not None:
-            node = node.parent
+        parent_ref = node._parent
+        while parent_ref is not None:
+            parent = parent_ref()
+            if parent is None:
+                break
+            node = parent
+            parent_ref = node._parent
         return node
 
     def attach_child(self, node: ScopeTreeNode) -> None:
@@ -261,15 +313,17 @@ class ScopeTreeNode:
         performed.  For safe tree modification, use attach_subtree()""
         """
         if node.path_id is not None:
-            for child in self.children:
-                if child.path_id == node.path_id:
-                    raise InvalidScopeConfiguration(
-                        f'{node.path_id} is already present in {self!r}')
+            existing = self.find_child(node.path_id)
+            if existing is not None:
+                raise InvalidScopeConfiguration(
+                    f'{node.path_id} is already present in {self!r}',
+                    offending_node=node,
+                    existing_node=existing,
+                )
 
         if node.unique_id is not None:
-            for child in self.children:
-                if child.unique_id == node.unique_id:
-                    return
+            if self._find_child_by_unique_id(node.unique_id) is not None:
+                return
 
         node._set_parent(self)
 
@@ -323,6 +377,9 @@ class ScopeTreeNode:
             node = wrapper_node
 
         dns = node.descendant_namespaces
+        # The loop below never re-parents self or any of its
+        # ancestors, so the nearest fence only needs to be found once.
+        self_fence = None
 
         for descendant in node.path_descendants:
             path_id = descendant.path_id.strip_namespace(dns)
@@ -349,7 +406,9 @@ class ScopeTreeNode:
                     if existing is not None:
                         parent_fence = existing.parent_fence
                 else:
-                    parent_fence = self.fence
+                    if self_fence is None:
+                        self_fence = self.fence
+                    parent_fence = self_fence
 
                 if existing is not None:
                     if parent_fence.find_child(path_id) is None:
@@ -411,11 +470,17 @@ class ScopeTreeNode:
     def remove_descendants(self, path_id: pathid.PathId) -> None:
         """Remove all descendant nodes matching *path_id*."""
 
-        matching = set()
+        matching = []
+        path_len = len(path_id)
 
         for node in self.descendants:
-            if _paths_equal_to_shortest_ns(node.path_id, path_id):
-                matching.add(node)
+            node_path_id = node.path_id
+            # Paths of a different length can never match, regardless of
+            # namespaces, so skip the comparison for those outright.
+            if (node_path_id is not None
+                    and len(node_path_id) == path_len
+                    and _paths_equal_to_shortest_ns(node_path_id, path_id)):
+                matching.append(node)
 
         for node in matching:
             node.remove()
@@ -437,13 +502,16 @@ class ScopeTreeNode:
         # Make sure we don't add namespaces that already appear
         # in on of the ancestors.
         namespaces = frozenset(namespaces) - self.get_effective_namespaces()
-        self.namespaces.update(namespaces)
+        if namespaces:
+            # Namespace sets are never mutated in place, so copies of
+            # the tree can share them.
+            self.namespaces = self.namespaces | namespaces
 
     def get_effective_namespaces(self):
         namespaces = set()
 
-        for _node, ans in self.ancestors_and_namespaces:
-            namespaces |= ans
+        for node in self.ancestors:
+            namespaces.update(node.namespaces)
 
         return namespaces
 
@@ -462,7 +530,7 @@ class ScopeTreeNode:
         if self.path_id is not None:
             subtree = ScopeTreeNode()
 
-            for child in self.children:
+            for child in tuple(self.children):
                 subtree.attach_child(child)
         else:
             subtree = self
@@ -493,11 +561,15 @@ class ScopeTreeNode:
     def is_empty(self):
         if self.path_id is not None:
             return False
-        else:
-            return (
-                not self.children or
-                all(c.is_empty() for c in self.children)
-            )
+
+        stack = list(self.children)
+        while stack:
+            node = stack.pop()
+            if node.path_id is not None:
+                return False
+            stack.extend(node.children)
+
+        return True
 
     def get_all_visible(self) -> Set[pathid.PathId]:
         paths = set()
@@ -505,6 +577,8 @@ class ScopeTreeNode:
         for node in self.ancestors:
             if node.path_id:
                 paths.add(node.path_id)
+            elif node._children_by_path_id is not None:
+                paths.update(node._children_by_path_id)
             else:
                 for c in node.children:
                     if c.path_id:
@@ -515,17 +589,35 @@ class ScopeTreeNode:
     def find_visible(self, path_id: pathid.PathId) \
             -> Optional[ScopeTreeNode]:
         """Find the visible node with the given *path_id*."""
-        namespaces = set()
+        if path_id is None:
+            return None
 
-        for node, ans in self.ancestors_and_namespaces:
-            if _paths_equal(node.path_id, path_id, namespaces):
-                return node
+        namespaces: FrozenSet[str] = frozenset()
+        node = self
 
-            for child in node.children:
-                if _paths_equal(child.path_id, path_id, namespaces):
+        while node is not None:
+            if not namespaces:
+                # No namespaces in effect (the common case): path ids
+                # can be compared directly and the child index used.
+                if node.path_id == path_id:
+                    return node
+
+                child = node.find_child(path_id)
+                if child is not None:
                     return child
+            else:
+                if _paths_equal(node.path_id, path_id, namespaces):
+                    return node
+
+                for child in node.children:
+                    if _paths_equal(child.path_id, path_id, namespaces):
+                        return child
 
-            namespaces |= ans
+            if node.namespaces:
+                namespaces = namespaces | node.namespaces
+
+            parent_ref = node._parent
+            node = parent_ref() if parent_ref is not None else None
 
         return None
 
@@ -533,14 +625,51 @@ class ScopeTreeNode:
         return self.find_visible(path_id) is not None
 
     def is_any_prefix_visible(self, path_id: pathid.PathId) -> bool:
-        for prefix in reversed(list(path_id.iter_prefixes())):
-            if self.find_visible(prefix) is not None:
-                return True
+        prefixes = list(path_id.iter_prefixes())
+        candidates = set(prefixes)
+        namespaces: FrozenSet[str] = frozenset()
+
+        for node, ans in self.ancestors_and_namespaces:
+            if not namespaces:
+                if node.path_id in candidates:
+                    return True
+
+                for prefix in prefixes:
+                    if node.find_child(prefix) is not None:
+                        return True
+            else:
+                for candidate in itertools.chain((node,), node.children):
+                    cpath_id = candidate.path_id
+                    if (cpath_id is not None and
+                            cpath_id.strip_namespace(namespaces)
+                            in candidates):
+                        return True
+
+            if ans is not namespaces:
+                namespaces = ans
+                candidates = {
+                    prefix.strip_namespace(namespaces)
+                    for prefix in prefixes
+                }
 
         return False
 
     def find_child(self, path_id: pathid.PathId, in_branches: bool = False) \
             -> Optional[ScopeTreeNode]:
+        index = self._children_by_path_id
+        if index is not None and path_id is not None:
+            child = index.get(path_id)
+            if child is not None or not in_branches:
+                return child
+
+            for child in self.children:
+                if child.path_id is None and not child.fenced:
+                    desc = child.find_child(path_id, in_branches=True)
+                    if desc is not None:
+                        return desc
+
+            return None
+
         for child in self.children:
             if child.path_id == path_id:
                 return child
@@ -572,7 +701,7 @@ class ScopeTreeNode:
     def find_unfenced(self, path_id: pathid.PathId) \
             -> Tuple[Optional[ScopeTreeNode], bool]:
         """Find the unfenced node with the given *path_id*."""
-        namespaces = set()
+        namespaces: FrozenSet[str] = frozenset()
         unnest_fence_seen = False
 
         for node, ans in self.ancestors_and_namespaces:
@@ -580,22 +709,74 @@ class ScopeTreeNode:
                 if _paths_equal(descendant.path_id, path_id, namespaces):
                     return descendant, unnest_fence_seen
 
-            namespaces |= ans
+            namespaces = ans
             unnest_fence_seen = unnest_fence_seen or node.unnest_fence
 
         return None, unnest_fence_seen
 
     def find_by_unique_id(self, unique_id: int) \
             -> Optional[ScopeTreeNode]:
+        index = self._unique_id_index
+        if index is None:
+            index = self._unique_id_index = {}
+        else:
+            # The tree may have been rearranged since the node
+            # was indexed, so make sure it is still ours.
+            node = index.get(unique_id)
+            if node is not None:
+                if (node.unique_id == unique_id
+                        and any(a is self for a in node.ancestors)):
+                    return node
+                del index[unique_id]
+
+        # Copies of view scopes can put the same unique id on several
+        # nodes, so keep the first one in walk order, like a plain walk
+        # would find.
         for node in self.descendants:
-            if node.unique_id == unique_id:
-                return node
+            if node.unique_id is not None:
+                index.setdefault(node.unique_id, node)
+                if node.unique_id == unique_id:
+                    return node
 
         return None
 
     def copy(self) -> ScopeTreeNode:
         """Return a complete copy of this subtree."""
-        return self._copy(parent=None)
+        root = self._copy_node()
+        stack = [(self, root)]
+        while stack:
+            node, cp = stack.pop()
+            if not node.children:
+                continue
+
+            # The copies are fresh nodes attached in the same order to a
+            # parent of their own, so the source node's child indexes are
+            # known to be valid for them and can be built in one go
+            # instead of going through _set_parent() for each child.
+            parent_ref = weakref.ref(cp)
+            children = cp.children
+            for child in node.children:
+                child_cp = child._copy_node()
+                child_cp._parent = parent_ref
+                children[child_cp] = None
+                stack.append((child, child_cp))
+
+            if node._children_by_path_id is None:
+                cp._children_by_path_id = None
+            else:
+                cp._children_by_path_id = {
+                    c._path_id: c for c in children if c._path_id is not None
+                }
+
+            if node._children_by_unique_id is None:
+                cp._children_by_unique_id = None
+            else:
+                cp._children_by_unique_id = {
+                    c._unique_id: c for c in children
+                    if c._unique_id is not None
+                }
+
+        return root
 
     def pformat(self):
         if self.children:
@@ -636,14 +817,54 @@ class ScopeTreeNode:
 
         if current_parent is not None:
             # Make sure no other node refers to us.
-            current_parent.children.remove(self)
+            del current_parent.children[self]
+            current_parent._unindex_child(self)
 
         if parent is not None:
             self._parent = weakref.ref(parent)
-            parent.children.add(self)
+            parent.children[self] = None
+            parent._index_child(self)
         else:
             self._parent = None
 
+    def _find_child_by_unique_id(self, unique_id: int) \
+            -> Optional[ScopeTreeNode]:
+        index = self._children_by_unique_id
+        if index is not None:
+            return index.get(unique_id)
+
+        for child in self.children:
+            if child.unique_id == unique_id:
+                return child
+
+        return None
+
+    def _index_child(self, child):
+        # Path ids and unique ids can be changed on nodes that are
+        # already attached, so siblings may end up sharing a key.  When
+        # that happens the affected index is dropped and lookups go back
+        # to scanning the children.
+        index = self._children_by_path_id
+        if index is not None and child._path_id is not None:
+            if index.setdefault(child._path_id, child) is not child:
+                self._children_by_path_id = None
+
+        index = self._children_by_unique_id
+        if index is not None and child._unique_id is not None:
+            if index.setdefault(child._unique_id, child) is not child:
+                self._children_by_unique_id = None
+
+    def _unindex_child(self, child):
+        index = self._children_by_path_id
+        if index is not None and child._path_id is not None:
+            if index.get(child._path_id) is child:
+                del index[child._path_id]
+
+        index = self._children_by_unique_id
+        if index is not None and child._unique_id is not None:
+            if index.get(child._unique_id) is child:
+                del index[child._unique_id]
+
 
 def _paths_equal(path_id_1: pathid.PathId, path_id_2: pathid.PathId,
                  namespaces: Set[str]) -> bool:
@@ -662,10 +883,10 @@ def _paths_equal_to_shortest_ns(path_id_1: pathid.PathId,
     if path_id_1 is None or path_id_2 is None:
         return False
 
-    ns1 = path_id_1.namespace or set()
-    ns2 = path_id_2.namespace or set()
+    ns1 = path_id_1.namespace or frozenset()
+    ns2 = path_id_2.namespace or frozenset()
 
-    if not ns1 and not ns2:
+    if ns1 == ns2:
         return path_id_1 == path_id_2
     else:
         extra_in_1 = ns1 - ns2
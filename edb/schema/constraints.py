@@ -19,6 +19,8 @@
 
 from __future__ import annotations
 
+import copy
+
 from edb import errors
 
 from edb import edgeql
@@ -38,6 +40,44 @@ from . import referencing
 from . import utils
 
 
+# Fields of the base constraint read by get_concrete_constraint_attrs().
+# All of them have defaults, so fetching them up front cannot raise.
+_BASE_CONSTRAINT_FIELDS = (
+    'subjectexpr', 'expr', 'args', 'errmessage', 'params',
+)
+
+# The __subject__ argument of a concrete constraint.  Like the cached
+# argument trees, it is only ever read or copied, so it can be shared.
+_SUBJECT_PATH = qlast.Path(steps=[qlast.Subject()])
+
+
+def _is_subject_path(ql: qlast.Base) -> bool:
+    if type(ql) is qlast.SelectQuery:
+        # Only the implicit SELECT wrapping a bare expression.
+        if (ql.aliases or ql.result_alias or ql.where or ql.orderby
+                or ql.offset is not None or ql.limit is not None):
+            return False
+        ql = ql.result
+
+    return (
+        isinstance(ql, qlast.Path)
+        and len(ql.steps) == 1
+        and isinstance(ql.steps[0], qlast.Subject)
+    )
+
+
+def _parse(text: str) -> qlast.Command:
+    from edb.edgeql import parser as qlparser
+
+    # Constraint expressions are rewritten in place when anchors and
+    # parameters get inlined, so always work on a private copy of
+    # the cached tree.
+    tree = copy.deepcopy(qlparser.parse_fragment_cached(text))
+    if not isinstance(tree, qlast.Command):
+        tree = qlast.SelectQuery(result=tree)
+    return tree
+
+
 class Constraint(referencing.ReferencedInheritingObject,
                  s_func.CallableObject, s_abc.Constraint,
                  qlkind=ft.SchemaObjectClass.CONSTRAINT):
@@ -111,7 +151,9 @@ class Constraint(referencing.ReferencedInheritingObject,
 
         orig_subjectexpr = subjectexpr
         orig_subject = subject
-        base_subjectexpr = constr_base.get_field_value(schema, 'subjectexpr')
+        base_fields = constr_base.get_schema_field_values(
+            schema, _BASE_CONSTRAINT_FIELDS)
+        base_subjectexpr = base_fields['subjectexpr']
         if subjectexpr is None:
             subjectexpr = base_subjectexpr
         elif (base_subjectexpr is not None
@@ -123,33 +165,36 @@ class Constraint(referencing.ReferencedInheritingObject,
         if subjectexpr is not None:
             subject_ql = subjectexpr.qlast
             if subject_ql is None:
-                subject_ql = qlparser.parse(subjectexpr.text, module_aliases)
+                subject_ql = _parse(subjectexpr.text)
 
             subject = subject_ql
 
-        expr: s_expr.Expression = constr_base.get_field_value(schema, 'expr')
+        expr: s_expr.Expression = base_fields['expr']
         if not expr:
             raise errors.InvalidConstraintDefinitionError(
                 f'missing constraint expression in {name!r}')
 
-        expr_ql = qlparser.parse(expr.text, module_aliases)
+        expr_ql = _parse(expr.text)
+        # Whether the constraint expression is just the subject itself
+        # (as in std::expression), checked before the anchors get inlined.
+        expr_is_subject = _is_subject_path(expr_ql)
 
         if not args:
-            args = constr_base.get_field_value(schema, 'args')
+            args = base_fields['args']
 
-        attrs = dict(kwargs)
-        inherited = dict()
+        # **kwargs is always a fresh dict, so it can be filled in directly.
+        attrs = kwargs
+        inherited = {}
         if orig_subjectexpr is not None:
             attrs['subjectexpr'] = orig_subjectexpr
         else:
-            base_subjectexpr = constr_base.get_subjectexpr(schema)
             if base_subjectexpr is not None:
                 attrs['subjectexpr'] = base_subjectexpr
                 inherited['subjectexpr'] = True
 
         errmessage = attrs.get('errmessage')
         if not errmessage:
-            errmessage = constr_base.get_errmessage(schema)
+            errmessage = base_fields['errmessage']
             inherited['errmessage'] = True
 
         attrs['errmessage'] = errmessage
@@ -159,19 +204,20 @@ class Constraint(referencing.ReferencedInheritingObject,
             qlutils.inline_anchors(expr_ql, anchors={qlast.Subject: subject})
             subject = orig_subject
 
+        params = base_fields['params']
         args_map = None
         if args:
-            args_ql = [
-                qlast.Path(steps=[qlast.Subject()]),
-            ]
+            args_ql = [_SUBJECT_PATH]
 
+            # The argument trees are only read here: inline_parameters()
+            # substitutes copies of them, so the cached trees can be
+            # used as is.
             args_ql.extend(
-                qlparser.parse(arg.text, module_aliases) for arg in args
-            )
+                qlparser.parse_fragment_cached(arg.text) for arg in args)
 
             args_map = qlutils.index_parameters(
                 args_ql,
-                parameters=constr_base.get_params(schema),
+                parameters=params,
                 schema=schema)
 
             qlutils.inline_parameters(expr_ql, args_map)
@@ -185,7 +231,7 @@ class Constraint(referencing.ReferencedInheritingObject,
 
         attrs['args'] = args
 
-        if expr == '__subject__':
+        if expr_is_subject:
             expr_context = sourcectx
         else:
             expr_context = None
@@ -199,7 +245,8 @@ class Constraint(referencing.ReferencedInheritingObject,
 
         bool_t = schema.get('std::bool')
         expr_type = final_expr.irast.stype
-        if not expr_type.issubclass(schema, bool_t):
+        if (expr_type is not bool_t
+                and not expr_type.issubclass(schema, bool_t)):
             raise errors.InvalidConstraintDefinitionError(
                 f'{name} constraint expression expected '
                 f'to return a bool value, got '
@@ -210,7 +257,7 @@ class Constraint(referencing.ReferencedInheritingObject,
         attrs['return_type'] = constr_base.get_return_type(schema)
         attrs['return_typemod'] = constr_base.get_return_typemod(schema)
         attrs['finalexpr'] = final_expr
-        attrs['params'] = constr_base.get_params(schema)
+        attrs['params'] = params
 
         return constr_base, attrs, inherited
 
@@ -331,10 +378,12 @@ class ConstraintCommand(
                     break
 
         if subjexpr_text is None and astnode.subjectexpr:
-            # if not, then use the origtext directly from the expression
-            expr = s_expr.Expression.from_ast(
-                astnode.subjectexpr, schema, context.modaliases)
-            subjexpr_text = expr.origtext
+            # if not, then use the origtext directly from the expression,
+            # which is just the source of the expression as written
+            # (Expression.from_ast() would also generate the normalized
+            # text, which is not needed here).
+            subjexpr_text = edgeql.generate_source(
+                astnode.subjectexpr, pretty=False)
 
         if subjexpr_text:
             exprs.append(subjexpr_text)
@@ -442,10 +491,7 @@ class CreateConstraint(ConstraintCommand,
                 sourcectx=self.source_context,
                 **props)
 
-            for k, v in attrs.items():
-                inherited = inh.get(k)
-                self.set_attribute_value(k, v, inherited=inherited)
-
+            self.set_attribute_values(attrs, inherited=inh)
             self.set_attribute_value('subject', subject)
 
         return super()._create_begin(schema, context)
@@ -487,7 +533,7 @@ class CreateConstraint(ConstraintCommand,
 
         parent_args = parent.get_args(schema)
         if parent_args:
-            for arg_expr in parent.get_args(schema):
+            for arg_expr in parent_args:
                 arg = edgeql.parse_fragment(arg_expr.text)
                 args.append(arg)
 
@@ -566,12 +612,15 @@ class CreateConstraint(ConstraintCommand,
 
         return cmd
 
-    def _apply_field_ast(self, schema, context, node, op):
+    def _apply_fields_ast(self, schema, context, node):
+        super()._apply_fields_ast(schema, context, node)
+
         subjectexpr = self.get_local_attribute_value('subjectexpr')
         if subjectexpr is not None:
             # add subjectexpr to the node
             node.subjectexpr = subjectexpr.qlast
 
+    def _apply_field_ast(self, schema, context, node, op):
         if op.property == 'delegated':
             if isinstance(node, qlast.CreateConcreteConstraint):
                 node.delegated = op.new_value
@@ -620,8 +669,8 @@ class AlterConstraint(ConstraintCommand,
             if getattr(astnode, 'delegated', False):
                 cmd.set_attribute_value('delegated', astnode.delegated)
 
-            for op in subject_ctx.op.get_subcommands(
-                    type=sd.RenameObject):
+            op = subject_ctx.op.get_last_subcommand(type=sd.RenameObject)
+            if op is not None:
                 new_subject_name = op.new_name
 
             if new_subject_name is not None:
@@ -635,7 +684,8 @@ class AlterConstraint(ConstraintCommand,
                 )
 
             new_name = None
-            for op in cmd.get_subcommands(type=RenameConstraint):
+            op = cmd.get_last_subcommand(type=RenameConstraint)
+            if op is not None:
                 new_name = op.new_name
 
             if new_name is not None:
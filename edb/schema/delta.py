@@ -223,6 +223,30 @@ class Command(struct.MixedStruct, metaclass=CommandMeta):
 
             self.add(op)
 
+    def set_attribute_values(self, values, *, inherited=None):
+        """Set several attributes at once.
+
+        This is equivalent to calling set_attribute_value() for each
+        item in *values*, but only scans the subcommands once.
+        *inherited* is an optional mapping of attribute names to
+        the value of the *inherited* flag for that attribute.
+        """
+        existing = {}
+        for op in self.get_subcommands(type=AlterObjectProperty):
+            existing.setdefault(op.property, op)
+
+        for attr_name, value in values.items():
+            op = existing.get(attr_name)
+            if op is not None:
+                op.new_value = value
+            else:
+                op = AlterObjectProperty(property=attr_name, new_value=value)
+                existing[attr_name] = op
+                self.add(op)
+
+            if inherited is not None and inherited.get(attr_name):
+                op.source = 'inheritance'
+
     def discard_attribute(self, attr_name):
         for op in self.get_subcommands(type=AlterObjectProperty):
             if op.property == attr_name:
@@ -240,6 +264,20 @@ class Command(struct.MixedStruct, metaclass=CommandMeta):
         else:
             return list(self)
 
+    def get_last_subcommand(self, *, type):
+        """Return the last subcommand of the given *type* or None.
+
+        The order is the same as in get_subcommands().
+        """
+        for op in reversed(self.ops):
+            if isinstance(op, type):
+                return op
+            for before_op in reversed(op.before_ops):
+                if isinstance(before_op, type):
+                    return before_op
+
+        return None
+
     def has_subcommands(self):
         return bool(self.ops)
 
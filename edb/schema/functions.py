@@ -19,6 +19,7 @@
 
 from __future__ import annotations
 
+import functools
 import types
 from typing import *  # NoQA
 
@@ -206,6 +207,7 @@ class Parameter(so.ObjectFragment, s_abc.Parameter):
         ft.ParameterKind, coerce=True, compcoef=0.4)
 
     @classmethod
+    @functools.lru_cache(4096)
     def paramname_from_fullname(cls, fullname):
         parts = str(fullname.name).split('@@', 1)
         if len(parts) == 2:
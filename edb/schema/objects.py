@@ -652,6 +652,28 @@ class Object(s_abc.Object, s_abc.ObjectContainer, metaclass=ObjectMeta):
         raise FieldValueNotFoundError(
             f'{self!r} object has no value for field {field_name!r}')
 
+    def get_schema_field_values(self, schema, field_names):
+        """Return a dict of values of the given schema fields.
+
+        All of *field_names* must be schema fields.  For those this is
+        equivalent to calling get_field_value() for each field, but
+        the object data is fetched from the schema only once.
+        """
+        cls = type(self)
+        for field_name in field_names:
+            if not cls.get_field(field_name).is_schema_field:
+                raise TypeError(
+                    f'{cls.__name__}.{field_name} is not a schema field')
+
+        values = schema._get_obj_fields(self.id, field_names)
+        result = {}
+        for field_name, val in zip(field_names, values):
+            if val is None:
+                # Fall back to the default value handling.
+                val = self._get_schema_field_value(schema, field_name)
+            result[field_name] = val
+        return result
+
     def get_field_value(self, schema, field_name, *, allow_default=True):
         field = type(self).get_field(field_name)
 
@@ -1528,14 +1550,27 @@ class ObjectIndexBase(ObjectCollection, container=tuple):
         return tuple(result)
 
     def has(self, schema, name):
-        return name in self.keys(schema)
+        keyfunc = type(self)._key
+
+        for obj in self.objects(schema):
+            if keyfunc(schema, obj) == name:
+                return True
+
+        return False
 
     def get(self, schema, name, default=...):
-        items = dict(self.items(schema))
+        # Keys are unique (see _check_duplicates()), so the first
+        # match is the only one.
+        keyfunc = type(self)._key
+
+        for obj in self.objects(schema):
+            if keyfunc(schema, obj) == name:
+                return obj
+
         if default is ...:
-            return items[name]
+            raise KeyError(name)
         else:
-            return items.get(name, default)
+            return default
 
 
 class ObjectIndexByFullname(
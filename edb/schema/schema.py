@@ -197,6 +197,17 @@ class Schema(s_abc.Schema):
 
         return d.get(field)
 
+    def _get_obj_fields(self, obj_id, fields):
+        try:
+            d = self._id_to_data[obj_id]
+        except KeyError:
+            err = (f'cannot get {", ".join(map(repr, fields))} values: '
+                   f'item {str(obj_id)!r} '
+                   f'is not present in the schema {self!r}')
+            raise errors.SchemaError(err) from None
+
+        return tuple(d.get(field) for field in fields)
+
     def _set_obj_field(self, obj_id, field, value):
         try:
             data = self._id_to_data[obj_id]
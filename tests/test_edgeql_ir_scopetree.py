@@ -27,6 +27,9 @@ from edb.testbase import lang as tb
 
 from edb.edgeql import compiler
 
+from edb.ir import pathid
+from edb.ir import scopetree
+
 
 class TestEdgeQLIRScopeTree(tb.BaseEdgeQLCompilerTest):
     """Unit tests for scope tree logic."""
@@ -34,6 +37,12 @@ class TestEdgeQLIRScopeTree(tb.BaseEdgeQLCompilerTest):
     SCHEMA = os.path.join(os.path.dirname(__file__), 'schemas',
                           'cards.esdl')
 
+    def _path_ids(self, *names):
+        return [
+            pathid.PathId.from_type(self.schema, self.schema.get(name))
+            for name in names
+        ]
+
     def run_test(self, *, source, spec, expected):
         ir = compiler.compile_to_ir(source, self.schema)
 
@@ -807,3 +816,135 @@ class TestEdgeQLIRScopeTree(tb.BaseEdgeQLCompilerTest):
                 users := array_agg((SELECT U.id ORDER BY U.r LIMIT 10))
             )
         """
+
+    def test_edgeql_ir_scope_tree_index_path_id_01(self):
+        # Rewriting the path id of an attached node must re-key it
+        # in the parent's child index.
+        user, card = self._path_ids('test::User', 'test::Card')
+
+        root = scopetree.ScopeTreeNode()
+        node = scopetree.ScopeTreeNode(path_id=user)
+        root.attach_child(node)
+        self.assertIs(root.find_child(user), node)
+
+        node.path_id = card
+        self.assertIs(root.find_child(card), node)
+        self.assertIsNone(root.find_child(user))
+
+        other = scopetree.ScopeTreeNode(path_id=user)
+        root.attach_child(other)
+        self.assertIs(root.find_child(user), other)
+
+        with self.assertRaises(scopetree.InvalidScopeConfiguration):
+            root.attach_child(scopetree.ScopeTreeNode(path_id=card))
+
+    def test_edgeql_ir_scope_tree_index_path_id_02(self):
+        # Siblings that end up sharing a path id must not make the
+        # other sibling unreachable.
+        user, card, award = self._path_ids(
+            'test::User', 'test::Card', 'test::Award')
+
+        root = scopetree.ScopeTreeNode()
+        first = scopetree.ScopeTreeNode(path_id=user)
+        second = scopetree.ScopeTreeNode(path_id=card)
+        root.attach_child(first)
+        root.attach_child(second)
+
+        second.path_id = user
+        self.assertIs(root.find_child(user), first)
+        self.assertIsNone(root.find_child(card))
+
+        second.path_id = award
+        self.assertIs(root.find_child(user), first)
+        self.assertIs(root.find_child(award), second)
+
+        second.remove()
+        self.assertIs(root.find_child(user), first)
+        self.assertIsNone(root.find_child(award))
+
+        with self.assertRaises(scopetree.InvalidScopeConfiguration):
+            root.attach_child(scopetree.ScopeTreeNode(path_id=user))
+
+    def test_edgeql_ir_scope_tree_index_copy_01(self):
+        user, card, award = self._path_ids(
+            'test::User', 'test::Card', 'test::Award')
+
+        root = scopetree.ScopeTreeNode()
+        root.attach_child(scopetree.ScopeTreeNode(path_id=user, unique_id=1))
+        branch = root.attach_branch()
+        branch.attach_child(scopetree.ScopeTreeNode(path_id=card))
+        collided = scopetree.ScopeTreeNode(path_id=award, unique_id=2)
+        branch.attach_child(collided)
+        collided.path_id = card
+
+        cp = root.copy()
+        cp_user = cp.find_child(user)
+        self.assertIsNotNone(cp_user)
+        self.assertIn(cp_user, cp.children)
+        self.assertIs(cp_user.parent, cp)
+        self.assertIs(cp.find_by_unique_id(1), cp_user)
+
+        cp_branch = next(c for c in cp.children if c.path_id is None)
+        self.assertIs(cp.find_child(card, in_branches=True),
+                      next(iter(cp_branch.children)))
+        self.assertIs(cp.find_by_unique_id(2).parent, cp_branch)
+        self.assertIsNone(cp_branch.find_child(award))
+
+        # The copy is independent of the original.
+        cp_user.path_id = award
+        self.assertIs(cp.find_child(award), cp_user)
+        self.assertIsNone(root.find_child(award))
+        self.assertIsNotNone(root.find_child(user))
+
+        with self.assertRaises(scopetree.InvalidScopeConfiguration):
+            cp_branch.attach_child(scopetree.ScopeTreeNode(path_id=card))
+
+    def test_edgeql_ir_scope_tree_index_unique_id_01(self):
+        # find_by_unique_id() must not return nodes that have been
+        # detached or moved after they were indexed.
+        user, card = self._path_ids('test::User', 'test::Card')
+
+        root = scopetree.ScopeTreeNode()
+        branch = root.attach_branch()
+        node = scopetree.ScopeTreeNode(path_id=user, unique_id=1)
+        branch.attach_child(node)
+        self.assertIs(root.find_by_unique_id(1), node)
+
+        node.remove()
+        self.assertIsNone(root.find_by_unique_id(1))
+
+        other = scopetree.ScopeTreeNode()
+        other.attach_child(node)
+        self.assertIs(other.find_by_unique_id(1), node)
+        self.assertIsNone(root.find_by_unique_id(1))
+
+        branch.attach_child(node)
+        self.assertIs(root.find_by_unique_id(1), node)
+        self.assertIsNone(other.find_by_unique_id(1))
+
+        node.unique_id = 3
+        self.assertIsNone(root.find_by_unique_id(1))
+        self.assertIs(root.find_by_unique_id(3), node)
+
+    def test_edgeql_ir_scope_tree_index_unique_id_02(self):
+        # Copied view scopes may share unique ids, in which case the
+        # first node in walk order must be found, whichever id was
+        # looked up first.
+        user, card = self._path_ids('test::User', 'test::Card')
+
+        root = scopetree.ScopeTreeNode()
+        first = scopetree.ScopeTreeNode(path_id=user, unique_id=1)
+        root.attach_branch().attach_child(first)
+
+        branch = root.attach_branch()
+        branch.attach_child(first.copy())
+        branch.attach_child(scopetree.ScopeTreeNode(path_id=card, unique_id=2))
+
+        self.assertIsNotNone(root.find_by_unique_id(2))
+        self.assertIs(root.find_by_unique_id(1), first)
+
+        first.remove()
+        second = root.find_by_unique_id(1)
+        self.assertIsNotNone(second)
+        self.assertIsNot(second, first)
+        self.assertIs(second.parent, branch)
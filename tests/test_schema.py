@@ -193,6 +193,35 @@ _123456789_123456789_123456789 -> str
             }
         """
 
+    @tb.must_fail(errors.InvalidConstraintDefinitionError,
+                  "constraint expression expected to return a bool value, "
+                  "got 'int64'",
+                  position=86)
+    def test_schema_constraint_non_bool_expr_01(self):
+        """
+            type Object1 {
+                property foo -> str {
+                    constraint expression on (len(__subject__));
+                }
+            };
+        """
+
+    @tb.must_fail(errors.InvalidConstraintDefinitionError,
+                  "constraint expression expected to return a bool value, "
+                  "got 'str'")
+    def test_schema_constraint_non_bool_expr_02(self):
+        """
+            abstract constraint my_constr {
+                expr := (SELECT __subject__ FILTER __subject__ = 'foo');
+            };
+
+            type Object1 {
+                property foo -> str {
+                    constraint my_constr;
+                }
+            };
+        """
+
     def test_schema_computable_cardinality_inference_01(self):
         schema = self.load_schema("""
             type Object {
@@ -598,6 +627,97 @@ _123456789_123456789_123456789 -> str
             "link 'bar' of object type 'test::Object1'",
         )
 
+    def test_schema_get_schema_field_values_01(self):
+        schema = self.load_schema("""
+            type Object1 {
+                property foo -> str {
+                    constraint max_len_value(10);
+                }
+            };
+        """)
+
+        foo_prop = schema.get('test::Object1').getptr(schema, 'foo')
+        constr = next(iter(foo_prop.get_constraints(schema).objects(schema)))
+
+        for obj in (constr, constr.get_bases(schema).first(schema)):
+            fields = ('name', 'subjectexpr', 'expr', 'args',
+                      'errmessage', 'params', 'is_local')
+            values = obj.get_schema_field_values(schema, fields)
+
+            self.assertEqual(list(values), list(fields))
+            for field in fields:
+                self.assertEqual(
+                    values[field], obj.get_field_value(schema, field),
+                    f'{field} differs from get_field_value()')
+
+        with self.assertRaisesRegex(TypeError, 'not a schema field'):
+            constr.get_schema_field_values(schema, ('name', 'id'))
+
+    def test_schema_delta_set_attribute_values_01(self):
+        cmd = s_delta.CommandGroup()
+        cmd.set_attribute_value('foo', 1)
+        cmd.set_attribute_value('bar', 2)
+
+        cmd.set_attribute_values(
+            {'bar': 20, 'baz': 30, 'foo': 10},
+            inherited={'baz': True, 'foo': False},
+        )
+
+        ops = list(cmd.get_subcommands(type=s_delta.AlterObjectProperty))
+        self.assertEqual(
+            [(op.property, op.new_value, op.source) for op in ops],
+            [('foo', 10, None), ('bar', 20, None),
+             ('baz', 30, 'inheritance')],
+        )
+
+        # Setting a value again updates the existing command, and
+        # the inherited flag is only ever added, as with
+        # set_attribute_value().
+        cmd.set_attribute_values({'foo': 100}, inherited={'foo': True})
+        cmd.set_attribute_values({'baz': 300})
+
+        ops = list(cmd.get_subcommands(type=s_delta.AlterObjectProperty))
+        self.assertEqual(
+            [(op.property, op.new_value, op.source) for op in ops],
+            [('foo', 100, 'inheritance'), ('bar', 20, None),
+             ('baz', 300, 'inheritance')],
+        )
+
+    def test_schema_delta_get_last_subcommand_01(self):
+        cmd = s_delta.CommandGroup()
+        self.assertIsNone(
+            cmd.get_last_subcommand(type=s_delta.AlterObjectProperty))
+
+        first = s_delta.AlterObjectProperty(property='foo')
+        second = s_delta.AlterObjectProperty(property='bar')
+        before = s_delta.AlterObjectProperty(property='baz')
+        other = s_delta.Command()
+        other.before_ops.add(before)
+
+        cmd.add(first)
+        cmd.add(second)
+        cmd.add(other)
+
+        # Subcommands are iterated with before_ops preceding their
+        # command, so the last one is the last one in that order.
+        self.assertIs(
+            cmd.get_last_subcommand(type=s_delta.AlterObjectProperty),
+            before)
+        self.assertIs(
+            cmd.get_last_subcommand(type=s_delta.AlterObjectProperty),
+            list(cmd.get_subcommands(
+                type=s_delta.AlterObjectProperty))[-1])
+
+        second.before_ops.add(s_delta.AlterObjectProperty(property='qux'))
+        cmd.discard(other)
+        self.assertIs(
+            cmd.get_last_subcommand(type=s_delta.AlterObjectProperty),
+            second)
+        self.assertIs(
+            cmd.get_last_subcommand(type=s_delta.AlterObjectProperty),
+            list(cmd.get_subcommands(
+                type=s_delta.AlterObjectProperty))[-1])
+
 
 class TestGetMigration(tb.BaseSchemaLoadTest):
     """Test migration deparse consistency.